@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# License: GPLv3 Copyright: 2022, Kovid Goyal <kovid at kovidgoyal.net>
+
+import io
+import os
+import subprocess
+import sys
+from contextlib import contextmanager, suppress
+from typing import Iterator, List, Optional
+
+
+@contextmanager
+def replace_if_needed(path: str, show_diff: bool = False, header: str = '', changed: Optional[List[str]] = None) -> Iterator[io.StringIO]:
+    buf = io.StringIO()
+    origb = sys.stdout
+    sys.stdout = buf
+    try:
+        yield buf
+    finally:
+        sys.stdout = origb
+    orig = ''
+    with suppress(FileNotFoundError), open(path, 'r') as f:
+        orig = f.read()
+    new = header + buf.getvalue()
+    if orig != new:
+        if changed is not None:
+            changed.append(path)
+        if show_diff:
+            with open(path + '.new', 'w') as f:
+                f.write(new)
+                subprocess.run(['diff', '-Naurp', path, f.name], stdout=open('/dev/tty', 'w'))
+                os.remove(f.name)
+        with open(path, 'w') as f:
+            f.write(new)
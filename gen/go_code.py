@@ -12,14 +12,14 @@
 import subprocess
 import sys
 import tarfile
-from contextlib import contextmanager, suppress
+from contextlib import suppress
 from functools import lru_cache
 from itertools import chain
 from typing import (
     Any,
     BinaryIO,
+    ContextManager,
     Dict,
-    Iterator,
     List,
     Optional,
     Sequence,
@@ -55,6 +55,7 @@
     __main__.__package__ = 'gen'
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from . import replace_if_needed as gen_replace_if_needed
 
 changed: List[str] = []
 
@@ -623,29 +624,9 @@ def generate_constants() -> str:
 
 # Boilerplate {{{
 
-@contextmanager
-def replace_if_needed(path: str, show_diff: bool = False) -> Iterator[io.StringIO]:
-    buf = io.StringIO()
-    origb = sys.stdout
-    sys.stdout = buf
-    try:
-        yield buf
-    finally:
-        sys.stdout = origb
-    orig = ''
-    with suppress(FileNotFoundError), open(path, 'r') as f:
-        orig = f.read()
-    new = buf.getvalue()
-    new = f'// Code generated by {os.path.basename(__file__)}; DO NOT EDIT.\n\n' + new
-    if orig != new:
-        changed.append(path)
-        if show_diff:
-            with open(path + '.new', 'w') as f:
-                f.write(new)
-                subprocess.run(['diff', '-Naurp', path, f.name], stdout=open('/dev/tty', 'w'))
-                os.remove(f.name)
-        with open(path, 'w') as f:
-            f.write(new)
+def replace_if_needed(path: str, show_diff: bool = False) -> ContextManager[io.StringIO]:
+    header = f'// Code generated by {os.path.basename(__file__)}; DO NOT EDIT.\n\n'
+    return gen_replace_if_needed(path, show_diff, header, changed)
 
 
 @lru_cache(maxsize=256)
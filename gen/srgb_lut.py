@@ -3,14 +3,15 @@
 
 import os
 import sys
-from functools import lru_cache
-from typing import List
+from typing import Dict, List, Tuple
 
 if __name__ == '__main__' and not __package__:
     import __main__
     __main__.__package__ = 'gen'
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from . import replace_if_needed
+
 
 def to_linear(a: float) -> float:
     if a <= 0.04045:
@@ -19,19 +20,21 @@ def to_linear(a: float) -> float:
         return float(pow((a + 0.055) / 1.055, 2.4))
 
 
-@lru_cache
-def generate_srgb_lut(line_prefix: str = '    ') -> List[str]:
-    values: List[str] = []
-    lines: List[str] = []
-
-    for i in range(256):
-        values.append('{:1.5f}f'.format(to_linear(i / 255.0)))
+_VALUES = tuple(f'{to_linear(i / 255.0):1.5f}f' for i in range(256))
+_LINES_BY_PREFIX: Dict[str, Tuple[str, ...]] = {}
 
-    for i in range(16):
-        lines.append(line_prefix + ', '.join(values[i * 16:(i + 1) * 16]) + ',')
 
+def _build(line_prefix: str) -> Tuple[str, ...]:
+    lines = [line_prefix + ', '.join(_VALUES[i * 16:(i + 1) * 16]) + ',' for i in range(16)]
     lines[-1] = lines[-1].rstrip(',')
-    return lines
+    return tuple(lines)
+
+
+def generate_srgb_lut(line_prefix: str = '    ') -> List[str]:
+    ans = _LINES_BY_PREFIX.get(line_prefix)
+    if ans is None:
+        ans = _LINES_BY_PREFIX[line_prefix] = _build(line_prefix)
+    return list(ans)
 
 
 def generate_srgb_gamma(declaration: str = 'static const GLfloat srgb_lut[256] = {', close: str = '};') -> str:
@@ -49,7 +52,7 @@ def generate_srgb_gamma(declaration: str = 'static const GLfloat srgb_lut[256] =
 
 def main(args: List[str]=sys.argv) -> None:
     c = generate_srgb_gamma()
-    with open(os.path.join('kitty', 'srgb_gamma.h'), 'w') as f:
+    with replace_if_needed(os.path.join('kitty', 'srgb_gamma.h')) as f:
         f.write(f'{c}\n')
 
 
@@ -4,6 +4,7 @@
 from contextlib import suppress
 from dataclasses import dataclass, field
 from io import BytesIO
+from itertools import chain
 from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NoReturn, Optional, Set, Tuple, Type, Union, cast
 
 from kitty.cli import CompletionSpec, get_defaults_from_seq, parse_args, parse_option_spec
@@ -391,22 +392,26 @@ def windows_for_payload(
         self, boss: 'Boss', window: Optional['Window'], payload_get: PayloadGetType,
         window_match_name: str = 'match_window', tab_match_name: str = 'match_tab',
     ) -> List['Window']:
+        return list(self.iter_windows_for_payload(boss, window, payload_get, window_match_name, tab_match_name))
+
+    def iter_windows_for_payload(
+        self, boss: 'Boss', window: Optional['Window'], payload_get: PayloadGetType,
+        window_match_name: str = 'match_window', tab_match_name: str = 'match_tab',
+    ) -> Iterable['Window']:
+        # Avoids materializing the list of windows, the result can be iterated over only once
         if payload_get('all'):
-            windows = list(boss.all_windows)
-        else:
-            window = window or boss.active_window
-            windows = [window] if window else []
-            if payload_get(window_match_name):
-                windows = list(boss.match_windows(payload_get(window_match_name)))
-                if not windows:
-                    raise MatchError(payload_get(window_match_name))
-            if payload_get(tab_match_name):
-                tabs = tuple(boss.match_tabs(payload_get(tab_match_name)))
-                if not tabs:
-                    raise MatchError(payload_get(tab_match_name), 'tabs')
-                windows = []
-                for tab in tabs:
-                    windows += list(tab)
+            return boss.all_windows
+        window = window or boss.active_window
+        windows: Iterable['Window'] = [window] if window else []
+        if payload_get(window_match_name):
+            windows = list(boss.match_windows(payload_get(window_match_name)))
+            if not windows:
+                raise MatchError(payload_get(window_match_name))
+        if payload_get(tab_match_name):
+            tabs = tuple(boss.match_tabs(payload_get(tab_match_name)))
+            if not tabs:
+                raise MatchError(payload_get(tab_match_name), 'tabs')
+            windows = chain.from_iterable(tabs)
         return windows
 
     def create_async_responder(self, payload_get: PayloadGetType, window: Optional[Window]) -> AsyncResponder:
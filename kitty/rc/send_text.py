@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 # License: GPLv3 Copyright: 2020, Kovid Goyal <kovid at kovidgoyal.net>
 
-import base64
+import binascii
+import io
 import sys
-from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Union
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional, Set, Union, cast
 
 from kitty.fast_data_types import KeyEvent as WindowSystemKeyEvent
 from kitty.fast_data_types import get_boss
@@ -38,7 +40,8 @@ def __init__(self, id: str):
         self.window_ids = set()
 
 
-sessions_map: Dict[str, Session] = {}
+sessions_map: 'OrderedDict[str, Session]' = OrderedDict()
+MAX_SESSIONS = 256
 
 
 class SessionAction:
@@ -128,12 +131,27 @@ class SendText(RemoteCommand):
     args = RemoteCommand.Args(spec='[TEXT TO SEND]', json_field='data', special_parse='+session_id:parse_send_text(io_data, args)')
 
     def message_to_kitty(self, global_opts: RCOptions, opts: 'CLIOptions', args: ArgsType) -> PayloadType:
-        limit = 1024
+        limit, batch_size = 1024, 64 * 1024
         ret = {
             'match': opts.match, 'data': '', 'match_tab': opts.match_tab, 'all': opts.all, 'exclude_active': opts.exclude_active,
             'bracketed_paste': opts.bracketed_paste,
         }
 
+        def binary_pipe(f: Union[io.RawIOBase, io.BufferedIOBase]) -> CmdGenerator:
+            # read in small pieces but send large batches to reduce the number of messages
+            buf = bytearray(batch_size)
+            mv = memoryview(buf)
+            pos = 0
+            while True:
+                n = f.readinto(mv[pos:pos + limit])
+                pos += n or 0
+                if pos and (not n or pos + limit > batch_size):
+                    ret['data'] = 'base64:' + binascii.b2a_base64(mv[:pos], newline=False).decode('ascii')
+                    yield ret
+                    pos = 0
+                if not n:
+                    break
+
         def pipe() -> CmdGenerator:
             if sys.stdin.isatty():
                 ret['exclude_active'] = True
@@ -153,29 +171,17 @@ def pipe() -> CmdGenerator:
                         ret['data'] = f'text:{decoded_data}'
                         yield ret
             else:
-                while True:
-                    data = sys.stdin.buffer.read(limit)
-                    if not data:
-                        break
-                    ret['data'] = f'base64:{base64.standard_b64encode(data).decode("ascii")}'
-                    yield ret
+                yield from binary_pipe(cast(io.BufferedReader, sys.stdin.buffer))
 
         def chunks(text: str) -> CmdGenerator:
-            data = parse_send_text_bytes(text)
-            while data:
-                b = base64.standard_b64encode(data[:limit]).decode("ascii")
-                ret['data'] = f'base64:{b}'
+            mv = memoryview(parse_send_text_bytes(text))
+            for start in range(0, len(mv), limit):
+                ret['data'] = 'base64:' + binascii.b2a_base64(mv[start:start + limit], newline=False).decode('ascii')
                 yield ret
-                data = data[limit:]
 
         def file_pipe(path: str) -> CmdGenerator:
-            with open(path, 'rb') as f:
-                while True:
-                    data = f.read(limit)
-                    if not data:
-                        break
-                    ret['data'] = f'base64:{base64.standard_b64encode(data).decode("ascii")}'
-                    yield ret
+            with open(path, 'rb', buffering=0) as f:
+                yield from binary_pipe(f)
 
         sources = []
         if opts.stdin:
@@ -194,16 +200,17 @@ def chain() -> CmdGenerator:
 
     def response_from_kitty(self, boss: Boss, window: Optional[Window], payload_get: PayloadGetType) -> ResponseType:
         sid = payload_get('session_id', '')
-        windows = self.windows_for_payload(boss, None, payload_get, window_match_name='match')
+        windows = self.iter_windows_for_payload(boss, None, payload_get, window_match_name='match')
         pdata: str = payload_get('data')
         encoding, _, q = pdata.partition(':')
         session = ''
         if encoding == 'text':
             data: Union[bytes, WindowSystemKeyEvent] = q.encode('utf-8')
         elif encoding == 'base64':
-            data = base64.standard_b64decode(q)
+            # a2b_base64 reads the ASCII str directly, standard_b64decode would first copy it into bytes
+            data = binascii.a2b_base64(q)
         elif encoding == 'kitty-key':
-            bdata = base64.standard_b64decode(q)
+            bdata = binascii.a2b_base64(q)
             candidate = decode_key_event_as_window_system_key(bdata.decode('ascii'))
             if candidate is None:
                 raise ValueError(f'Could not decode window system key: {q}')
@@ -216,13 +223,22 @@ def response_from_kitty(self, boss: Boss, window: Optional[Window], payload_get:
         actual_windows = (w for w in windows if w is not None and (not exclude_active or w is not boss.active_window))
 
         def create_or_update_session() -> Session:
-            s = sessions_map.setdefault(sid, Session(sid))
+            s = sessions_map.get(sid)
+            if s is None:
+                s = sessions_map[sid] = Session(sid)
+                # sessions whose client went away without ending them would otherwise leak
+                while len(sessions_map) > MAX_SESSIONS:
+                    ClearSession(next(iter(sessions_map)))()
+            else:
+                sessions_map.move_to_end(sid)
             return s
         if session == 'end':
-            s = create_or_update_session()
+            # do not create the session here as that could evict some other live session
+            ended = sessions_map.get(sid)
             for w in actual_windows:
                 w.screen.render_unfocused_cursor = False
-                s.window_ids.discard(w.id)
+                if ended is not None:
+                    ended.window_ids.discard(w.id)
             ClearSession(sid)()
         elif session == 'start':
             s = create_or_update_session()
@@ -240,19 +256,21 @@ def is_ok(x: Any) -> bool:
                 s.window_ids.add(w.id)
         else:
             bp = payload_get('bracketed_paste')
-            if sid:
-                s = create_or_update_session()
+            sess = create_or_update_session() if sid else None
+            bp_data = b''
             for w in actual_windows:
-                if sid:
+                if sess is not None:
                     w.screen.render_unfocused_cursor = True
-                    s.window_ids.add(w.id)
+                    sess.window_ids.add(w.id)
                 if isinstance(data, WindowSystemKeyEvent):
                     kdata = w.encoded_key(data)
                     if kdata:
                         w.write_to_child(kdata)
+                elif bp == 'enable' or (bp == 'auto' and w.screen.in_bracketed_paste_mode):
+                    if not bp_data:
+                        bp_data = b'\x1b[200~' + sanitize_for_bracketed_paste(data) + b'\x1b[201~'
+                    w.write_to_child(bp_data)
                 else:
-                    if bp == 'enable' or (bp == 'auto' and w.screen.in_bracketed_paste_mode):
-                        data = b'\x1b[200~' + sanitize_for_bracketed_paste(data) + b'\x1b[201~'
                     w.write_to_child(data)
         return None
 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# License: GPL v3 Copyright: 2026, Kovid Goyal <kovid at kovidgoyal.net>
+
+import base64
+import os
+import tempfile
+from types import SimpleNamespace
+
+from . import BaseTest
+
+
+class FakeScreen:
+
+    def __init__(self, in_bracketed_paste_mode=False):
+        self.in_bracketed_paste_mode = in_bracketed_paste_mode
+        self.render_unfocused_cursor = False
+
+
+class FakeWindow:
+
+    def __init__(self, wid, in_bracketed_paste_mode=False):
+        self.id = wid
+        self.screen = FakeScreen(in_bracketed_paste_mode)
+        self.written = []
+
+    def write_to_child(self, data):
+        self.written.append(data)
+
+
+class FakeBoss:
+
+    def __init__(self, *windows):
+        self.windows = windows
+        self.active_window = windows[0] if windows else None
+        self.window_id_map = {w.id: w for w in windows}
+
+    @property
+    def all_windows(self):
+        yield from self.windows
+
+
+class TestSendText(BaseTest):
+
+    def send(self, boss, data, **kw):
+        from kitty.rc.base import PayloadGetter
+        from kitty.rc.send_text import send_text
+        payload = {
+            'data': data, 'match': None, 'match_tab': None, 'all': True, 'exclude_active': False,
+            'session_id': '', 'bracketed_paste': 'disable',
+        }
+        payload.update(kw)
+        send_text.response_from_kitty(boss, None, PayloadGetter(send_text, payload))
+
+    def test_send_text_from_file(self):
+        from kitty.rc.send_text import send_text
+        batch_size = 64 * 1024
+
+        def payloads(path):
+            opts = SimpleNamespace(
+                match=None, match_tab=None, all=False, exclude_active=False, bracketed_paste='disable', stdin=False, from_file=path)
+            ans = []
+            for msg in send_text.message_to_kitty(None, opts, []):
+                encoding, _, q = msg['data'].partition(':')
+                self.ae(encoding, 'base64')
+                ans.append(base64.standard_b64decode(q))
+            return ans
+
+        with tempfile.TemporaryDirectory() as tdir:
+            path = os.path.join(tdir, 'data')
+            for size in (0, 1, batch_size, 3 * batch_size + 17):
+                data = os.urandom(size)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                chunks = payloads(path)
+                self.ae(b''.join(chunks), data)
+                self.ae(len(chunks), (size + batch_size - 1) // batch_size)
+                for c in chunks[:-1]:
+                    self.ae(len(c), batch_size)
+
+    def test_send_text_bracketed_paste(self):
+        text = b'some \x1b[201~text'
+        data = 'base64:' + base64.standard_b64encode(text).decode('ascii')
+        wrapped = b'\x1b[200~some text\x1b[201~'
+
+        windows = FakeWindow(1), FakeWindow(2), FakeWindow(3)
+        self.send(FakeBoss(*windows), data, bracketed_paste='enable')
+        for w in windows:
+            self.ae(w.written, [wrapped])
+
+        windows = FakeWindow(1, True), FakeWindow(2), FakeWindow(3, True), FakeWindow(4)
+        self.send(FakeBoss(*windows), data, bracketed_paste='auto')
+        for w in windows:
+            self.ae(w.written, [wrapped if w.screen.in_bracketed_paste_mode else text])
+
+        windows = FakeWindow(1, True), FakeWindow(2)
+        self.send(FakeBoss(*windows), data)
+        for w in windows:
+            self.ae(w.written, [text])
+
+    def test_send_text_session_eviction(self):
+        from kitty.rc import send_text as st
+        windows = FakeWindow(1), FakeWindow(2)
+        boss = FakeBoss(*windows)
+        orig_get_boss, st.get_boss = st.get_boss, lambda: boss
+        orig_map, st.sessions_map = st.sessions_map, type(st.sessions_map)()
+        try:
+            for i in range(st.MAX_SESSIONS):
+                self.send(boss, 'session:start', session_id=f's{i}')
+            self.ae(len(st.sessions_map), st.MAX_SESSIONS)
+            # ending unknown sessions must not evict live ones
+            self.send(boss, 'session:end', session_id='unknown')
+            self.ae(len(st.sessions_map), st.MAX_SESSIONS)
+            self.assertIn('s0', st.sessions_map)
+            # using a session makes it the most recently used one
+            self.send(boss, 'text:x', session_id='s0')
+            self.send(boss, 'session:start', session_id='new')
+            self.ae(len(st.sessions_map), st.MAX_SESSIONS)
+            self.assertNotIn('s1', st.sessions_map)
+            self.assertIn('s0', st.sessions_map)
+            self.assertIn('new', st.sessions_map)
+        finally:
+            st.get_boss = orig_get_boss
+            st.sessions_map = orig_map